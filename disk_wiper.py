@@ -32,12 +32,22 @@ Requirements:
 
 import argparse
 import contextlib
+import fcntl
+import functools
+import json
+import mmap
 import os
+import shutil
+import stat
+import struct
 import subprocess
 import sys
+import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, NoReturn
 
 # Version
 VERSION = "1.0.0"
@@ -60,25 +70,73 @@ class Colors:
 # =============================================================================
 
 
-def error(message: str) -> None:
+# Pending output lines of each thread, written to stdout by flush_output()
+_OUTPUT = threading.local()
+_OUTPUT_LOCK = threading.Lock()
+
+
+def emit(line: str = "") -> None:
+    """Queue a line of output until the next flush_output()"""
+    lines = getattr(_OUTPUT, "lines", None)
+    if lines is None:
+        lines = _OUTPUT.lines = []
+    lines.append(line)
+
+
+def flush_output() -> None:
+    """Write this thread's queued output to stdout in a single write"""
+    lines = getattr(_OUTPUT, "lines", None)
+    if not lines:
+        return
+    _OUTPUT.lines = []
+    with _OUTPUT_LOCK:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
+def progress(message: str) -> None:
+    """Emit a progress line and show it right away
+
+    Outside run_parallel, or with a single worker, queued output is flushed.
+    With several workers each one's log is still written as one block when it
+    finishes, so a one-line status tagged with its item is shown instead.
+    """
+    emit(message)
+    label = getattr(_OUTPUT, "label", None)
+    if label is None:
+        flush_output()
+        return
+    with _OUTPUT_LOCK:
+        sys.stdout.write(f"  [{label}] {message.strip()}\n")
+        sys.stdout.flush()
+
+
+def prompt(message: str) -> str:
+    """Flush queued output, then read a line of user input"""
+    flush_output()
+    return input(message)
+
+
+def error(message: str) -> NoReturn:
     """Print error message and exit"""
+    flush_output()
     print(f"{Colors.RED}ERROR: {message}{Colors.NC}", file=sys.stderr)
     sys.exit(1)
 
 
 def warn(message: str) -> None:
     """Print warning message"""
-    print(f"{Colors.YELLOW}WARNING: {message}{Colors.NC}")
+    emit(f"{Colors.YELLOW}WARNING: {message}{Colors.NC}")
 
 
 def success(message: str) -> None:
     """Print success message"""
-    print(f"{Colors.GREEN}✓ {message}{Colors.NC}")
+    emit(f"{Colors.GREEN}✓ {message}{Colors.NC}")
 
 
 def info(message: str) -> None:
     """Print info message"""
-    print(f"{Colors.CYAN}{message}{Colors.NC}")
+    emit(f"{Colors.CYAN}{message}{Colors.NC}")
 
 
 def run_command(cmd: list[str], check: bool = True) -> subprocess.CompletedProcess:
@@ -92,6 +150,56 @@ def run_command(cmd: list[str], check: bool = True) -> subprocess.CompletedProce
         return e
 
 
+def run_quiet(cmd: list[str]) -> subprocess.CompletedProcess:
+    """Run command whose output is not needed, discarding stdout and stderr"""
+    return subprocess.run(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+        timeout=30,
+    )
+
+
+# Set on Ctrl-C so worker threads stop before their next wipe step
+_CANCELLED = threading.Event()
+
+
+def check_cancelled() -> None:
+    """Stop the current worker if the user cancelled the run"""
+    if _CANCELLED.is_set():
+        raise KeyboardInterrupt
+
+
+def run_parallel(func: Callable[[str], Any], items: list[str]) -> list[Any]:
+    """Run func for every item in its own thread and return the results in order
+
+    Each item's output is written as one block when it finishes, so output
+    from items processed in parallel does not interleave. On Ctrl-C, pending
+    items are cancelled and running ones stop at their next check_cancelled().
+    """
+    if not items:
+        return []
+
+    def run(item: str) -> Any:
+        _OUTPUT.label = item if len(items) > 1 else None
+        try:
+            return func(item)
+        finally:
+            flush_output()
+
+    flush_output()
+    executor = ThreadPoolExecutor(max_workers=len(items))
+    try:
+        return list(executor.map(run, items))
+    except KeyboardInterrupt:
+        _CANCELLED.set()
+        raise
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
 def check_root() -> None:
     """Check if running as root"""
     if os.geteuid() != 0:
@@ -102,73 +210,195 @@ def check_tools() -> None:
     """Check required tools are installed"""
     missing_tools = []
 
-    for tool in ["wipefs", "sgdisk", "lsblk", "blkid", "dd", "blockdev", "partprobe", "sfdisk", "parted"]:
-        if not which(tool):
+    for tool in ["wipefs", "sgdisk", "lsblk", "blkid", "blockdev", "partprobe", "sfdisk", "parted"]:
+        if not have(tool):
             missing_tools.append(tool)
 
     if missing_tools:
         error(f"Missing required tools: {', '.join(missing_tools)}. Run setup script first.")
 
 
-def which(program: str) -> bool:
-    """Check if program exists in PATH"""
-    result = subprocess.run(["which", program], capture_output=True, timeout=5)
-    return result.returncode == 0
+@functools.cache
+def have(tool: str) -> bool:
+    """Check if tool exists in PATH"""
+    return shutil.which(tool) is not None
 
 
 # =============================================================================
 # Device Discovery
 # =============================================================================
 
+# All block devices from a single `lsblk -J -O` call, keyed by device path, and a
+# generation counter bumped on every refresh. Refreshed by sync_kernel_partitions
+# whenever the partition tables change. _SNAPSHOT_LOCK serializes refreshes, so a
+# slow lsblk from one wipe thread can never replace a newer snapshot with older data.
+# It is reentrant because refresh_snapshot invalidates the cache while holding it.
+_SNAPSHOT: dict[str, dict[str, Any]] = {}
+_GENERATION = 0
+_SNAPSHOT_LOCK = threading.RLock()
 
-def is_usb_device(device_path: str) -> bool:
-    """Check if device is a USB device"""
-    # Check transport type via lsblk
+
+def snapshot_devices() -> dict[str, dict[str, Any]]:
+    """Get every block device with all lsblk columns and its partition tree"""
     try:
-        result = run_command(["lsblk", "-d", "-n", "-o", "TRAN", device_path], check=False)
-        if result.returncode == 0:
-            transport = result.stdout.strip().lower()
-            if transport == "usb":
-                return True
-    except (subprocess.SubprocessError, OSError):
-        pass
+        result = run_command(["lsblk", "-J", "-O"], check=False)
+        if result.returncode != 0:
+            return {}
+        return {f"/dev/{dev['name']}": dev for dev in json.loads(result.stdout)["blockdevices"]}
+    except (subprocess.SubprocessError, OSError, ValueError, KeyError):
+        return {}
+
+
+def refresh_snapshot() -> None:
+    """Re-read the device snapshot from lsblk, invalidating cached device lookups"""
+    global _SNAPSHOT
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOT = snapshot_devices()
+        invalidate_device_cache()
+
+
+def invalidate_device_cache() -> None:
+    """Drop all cached device lookups, e.g. after a wipe step changed a drive"""
+    global _GENERATION
+    with _SNAPSHOT_LOCK:
+        _GENERATION += 1
+
+
+def get_snapshot_generation() -> tuple[dict[str, dict[str, Any]], int]:
+    """Get the device snapshot and its generation, taking it on first use"""
+    global _SNAPSHOT, _GENERATION
+    with _SNAPSHOT_LOCK:
+        if not _GENERATION:
+            _SNAPSHOT = snapshot_devices()
+            _GENERATION = 1
+        return _SNAPSHOT, _GENERATION
+
+
+def get_snapshot() -> dict[str, dict[str, Any]]:
+    """Get the device snapshot, taking it on first use"""
+    return get_snapshot_generation()[0]
+
+
+def cached_per_generation(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Cache a device lookup by (arguments, snapshot generation)"""
+    cache: dict[tuple[tuple[Any, ...], int], Any] = {}
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any) -> Any:
+        # Take the generation first, the lookup then reads this snapshot or a newer one,
+        # so a result is never cached under a newer generation than its data
+        _, generation = get_snapshot_generation()
+        key = (args, generation)
+        with lock:
+            if key in cache:
+                return cache[key]
+
+        value = func(*args)
+        with lock:
+            for stale in [cached for cached in cache if cached[1] < generation]:
+                del cache[stale]
+            cache[key] = value
+        return value
+
+    return wrapper
+
+
+def walk_device_tree(
+    device: dict[str, Any], indent: str = "", last: bool | None = None
+) -> list[tuple[str, dict[str, Any]]]:
+    """Flatten an lsblk device and its children into (branch, device) pairs
+
+    The branch is the lsblk-style tree prefix for the device's name, e.g. "├─"
+    for a child with later siblings or "│ └─" for the last child of such a child.
+    last is None for the root and tells whether the device is its parent's last child.
+    """
+    if last is None:
+        devices = [("", device)]
+        child_indent = ""
+    else:
+        devices = [(indent + ("└─" if last else "├─"), device)]
+        child_indent = indent + ("  " if last else "│ ")
+
+    children = device.get("children", [])
+    for index, child in enumerate(children):
+        devices.extend(walk_device_tree(child, child_indent, index == len(children) - 1))
+    return devices
+
+
+def format_device_table(devices: list[tuple[str, dict[str, Any]]], columns: list[str]) -> str:
+    """Render snapshot entries as an lsblk-style table"""
+    rows = [[column.upper() for column in columns]]
+    for branch, device in devices:
+        row = [str(device.get(column) or "") for column in columns]
+        row[0] = branch + row[0]
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join(
+        " ".join(cell.ljust(width) for cell, width in zip(row, widths, strict=True)).rstrip() for row in rows
+    )
 
-    # Also check by-id symlinks for "usb" in path
+
+@functools.cache
+def by_id_links() -> dict[str, list[str]]:
+    """Map each real device path to the names of its /dev/disk/by-id symlinks"""
+    links: dict[str, list[str]] = {}
     try:
-        by_id_dir = Path("/dev/disk/by-id")
-        if by_id_dir.exists():
-            for link in by_id_dir.iterdir():
-                try:
-                    if link.resolve() == Path(device_path).resolve() and "usb" in str(link).lower():
-                        return True
-                except (OSError, RuntimeError):
-                    continue
-    except (OSError, RuntimeError):
+        with os.scandir("/dev/disk/by-id") as entries:
+            for entry in entries:
+                links.setdefault(os.path.realpath(entry.path), []).append(entry.name)
+    except OSError:
         pass
+    return links
 
-    return False
+
+def is_usb_device(device_path: str) -> bool:
+    """Check if device is a USB device"""
+    # Check transport type via the lsblk snapshot
+    device = get_snapshot().get(os.path.realpath(device_path))
+    if device and (device.get("tran") or "").lower() == "usb":
+        return True
+
+    # Fall back to by-id symlinks with "usb" in their name
+    names = by_id_links().get(os.path.realpath(device_path), [])
+    return any("usb" in name.lower() for name in names)
 
 
 def get_all_block_devices() -> list[str]:
     """Get all block devices (disks only, not partitions)"""
     try:
-        result = run_command(["lsblk", "-d", "-n", "-o", "NAME,TYPE"], check=False)
-        if result.returncode != 0:
-            return []
+        with os.scandir("/sys/block") as entries:
+            names = sorted(entry.name for entry in entries)
+    except OSError:
+        return []
 
-        devices = []
-        for line in result.stdout.strip().split("\n"):
-            if not line.strip():
+    devices = []
+    for name in names:
+        # Only hardware-backed disks have a device link, optical drives are skipped by name
+        if name.startswith(("loop", "ram", "zram", "sr", "dm-", "md")):
+            continue
+        if not os.path.exists(f"/sys/block/{name}/device"):
+            continue
+
+        # Hidden disks (e.g. NVMe multipath paths like nvme0c0n1) have no /dev node
+        with contextlib.suppress(OSError):
+            if Path(f"/sys/block/{name}/hidden").read_text().strip() == "1":
                 continue
-            parts = line.split()
-            if len(parts) >= 2:
-                name, dev_type = parts[0], parts[1]
-                if dev_type == "disk":
-                    devices.append(f"/dev/{name}")
-
-        return devices
-    except (subprocess.SubprocessError, OSError):
-        return []
+        if resolve_block_device(f"/dev/{name}") is None:
+            continue
+
+        devices.append(f"/dev/{name}")
+    return devices
+
+
+def resolve_block_device(device_path: str) -> str | None:
+    """Resolve a device path to its real block device, None if it is not one"""
+    real_path = os.path.realpath(device_path)
+    try:
+        return real_path if stat.S_ISBLK(os.stat(real_path).st_mode) else None
+    except OSError:
+        return None
 
 
 def get_non_usb_devices() -> list[str]:
@@ -180,20 +410,21 @@ def get_non_usb_devices() -> list[str]:
 
 def show_all_devices() -> None:
     """Display all available block devices with details"""
-    print()
-    print("╔═══════════════════════════════════════════════════════════╗")
-    print("║                  Available Block Devices                  ║")
-    print("╚═══════════════════════════════════════════════════════════╗")
-    print()
-
-    try:
-        result = run_command(["lsblk", "-d", "-o", "NAME,SIZE,TYPE,TRAN,MODEL"], check=False)
-        if result.returncode == 0:
-            print(result.stdout)
-    except (subprocess.SubprocessError, OSError):
+    emit()
+    emit("╔═══════════════════════════════════════════════════════════╗")
+    emit("║                  Available Block Devices                  ║")
+    emit("╚═══════════════════════════════════════════════════════════╗")
+    emit()
+
+    snapshot = get_snapshot()
+    if snapshot:
+        devices = [("", device) for device in snapshot.values()]
+        emit(format_device_table(devices, ["name", "size", "type", "tran", "model"]))
+        emit()
+    else:
         warn("Could not list block devices")
 
-    print()
+    emit()
 
 
 # =============================================================================
@@ -201,13 +432,16 @@ def show_all_devices() -> None:
 # =============================================================================
 
 
-def get_device_info(device_path: str) -> dict[str, Any]:
-    """Get information about a device"""
+@cached_per_generation
+def lookup_device_info(device_path: str) -> tuple[dict[str, Any], list[str]]:
+    """Look up information about a device, along with any warnings for the caller to show"""
+    warnings = []
+
     # Resolve symlink to actual device
     try:
         real_device = Path(device_path).resolve()
     except (OSError, RuntimeError) as e:
-        warn(f"Could not resolve device path {device_path}: {e}")
+        warnings.append(f"Could not resolve device path {device_path}: {e}")
         real_device = device_path
 
     info = {
@@ -216,40 +450,54 @@ def get_device_info(device_path: str) -> dict[str, Any]:
         "exists": Path(real_device).exists() if isinstance(real_device, Path) else False,
     }
 
-    # Get device info from lsblk
+    # Get device info from the lsblk snapshot
     if info["exists"]:
-        try:
-            result = run_command(["lsblk", "-o", "NAME,SIZE,MODEL,SERIAL", str(real_device)], check=False)
-            if result.returncode == 0:
-                info["lsblk"] = result.stdout.strip()
-        except (subprocess.SubprocessError, OSError) as e:
-            warn(f"Could not query device info for {real_device}: {e}")
+        device = get_snapshot().get(str(real_device))
+        if device:
+            info["lsblk"] = format_device_table(walk_device_tree(device), ["name", "size", "model", "serial"])
+        else:
+            # Not a whole disk (e.g. a partition path), ask lsblk directly
+            try:
+                result = run_command(["lsblk", "-o", "NAME,SIZE,MODEL,SERIAL", str(real_device)], check=False)
+                if result.returncode == 0:
+                    info["lsblk"] = result.stdout.strip()
+            except (subprocess.SubprocessError, OSError) as e:
+                warnings.append(f"Could not query device info for {real_device}: {e}")
+
+    return info, warnings
 
+
+def get_device_info(device_path: str) -> dict[str, Any]:
+    """Get information about a device"""
+    # Warn on every call, cached lookups would otherwise only warn the first caller's thread
+    info, warnings = lookup_device_info(device_path)
+    for message in warnings:
+        warn(message)
     return info
 
 
 def show_devices_to_wipe(devices: list[str]) -> None:
     """Display all devices that will be wiped"""
-    print()
-    print("╔═══════════════════════════════════════════════════════════╗")
-    print("║              Devices to be Wiped                          ║")
-    print("╚═══════════════════════════════════════════════════════════╝")
-    print()
+    emit()
+    emit("╔═══════════════════════════════════════════════════════════╗")
+    emit("║              Devices to be Wiped                          ║")
+    emit("╚═══════════════════════════════════════════════════════════╝")
+    emit()
 
     for device in devices:
         device_info = get_device_info(device)
 
-        print(f"  Device: {device}")
+        emit(f"  Device: {device}")
         if device != device_info["real_path"]:
-            print(f"  → Resolves to: {device_info['real_path']}")
+            emit(f"  → Resolves to: {device_info['real_path']}")
 
         if device_info["exists"]:
             if "lsblk" in device_info:
                 for line in device_info["lsblk"].split("\n"):
-                    print(f"    {line}")
+                    emit(f"    {line}")
         else:
             warn(f"    Device not found: {device_info['real_path']}")
-        print()
+        emit()
 
 
 # =============================================================================
@@ -259,36 +507,38 @@ def show_devices_to_wipe(devices: list[str]) -> None:
 
 def confirm_wipe(devices: list[str]) -> bool:
     """Get confirmation from user before wiping"""
-    print()
-    print(f"{Colors.RED}{Colors.BOLD}╔═══════════════════════════════════════════════════════════╗{Colors.NC}")
-    print(f"{Colors.RED}{Colors.BOLD}║  YOU ARE ABOUT TO PERMANENTLY DESTROY ALL DATA           ║{Colors.NC}")
-    print(f"{Colors.RED}{Colors.BOLD}╚═══════════════════════════════════════════════════════════╝{Colors.NC}")
-    print()
-    print("The following devices will be COMPLETELY WIPED:")
-    print()
+    emit()
+    emit(f"{Colors.RED}{Colors.BOLD}╔═══════════════════════════════════════════════════════════╗{Colors.NC}")
+    emit(f"{Colors.RED}{Colors.BOLD}║  YOU ARE ABOUT TO PERMANENTLY DESTROY ALL DATA           ║{Colors.NC}")
+    emit(f"{Colors.RED}{Colors.BOLD}╚═══════════════════════════════════════════════════════════╝{Colors.NC}")
+    emit()
+    emit("The following devices will be COMPLETELY WIPED:")
+    emit()
 
     for device in devices:
         device_info = get_device_info(device)
-        print(f"  {Colors.RED}✗ {device}{Colors.NC}")
+        emit(f"  {Colors.RED}✗ {device}{Colors.NC}")
         if device != device_info["real_path"]:
-            print(f"    {Colors.RED}→ {device_info['real_path']}{Colors.NC}")
+            emit(f"    {Colors.RED}→ {device_info['real_path']}{Colors.NC}")
 
-    print()
+    emit()
     warn("This operation is IRREVERSIBLE!")
     warn("All partitions, filesystems, LVM, RAID metadata will be destroyed!")
-    print()
+    emit()
 
-    confirmation = input("Type 'WIPE ALL DATA' to confirm: ")
+    confirmation = prompt("Type 'WIPE ALL DATA' to confirm: ")
 
     if confirmation != "WIPE ALL DATA":
-        print("Aborted. No changes made.")
+        emit("Aborted. No changes made.")
+        flush_output()
         return False
 
-    print()
-    final_confirm = input("Are you absolutely sure? Type 'YES' to proceed: ")
+    emit()
+    final_confirm = prompt("Are you absolutely sure? Type 'YES' to proceed: ")
 
     if final_confirm != "YES":
-        print("Aborted. No changes made.")
+        emit("Aborted. No changes made.")
+        flush_output()
         return False
 
     return True
@@ -299,177 +549,275 @@ def confirm_wipe(devices: list[str]) -> bool:
 # =============================================================================
 
 MAX_WIPE_ATTEMPTS = 3
+ZERO_REGION_BYTES = 2 * 1024 * 1024  # 2MB covers MBR, GPT header, and partition entries
+BLKZEROOUT = 0x127F  # _IO(0x12, 127), zero a byte range of a block device
+BLKGETSIZE64 = 0x80081272  # _IOR(0x12, 114, size_t), device size in bytes
+
+
+def kernel_partitions(drive: str) -> list[str]:
+    """Get partitions and holders the kernel still has for a drive, read from sysfs"""
+    sys_dir = Path("/sys/class/block") / Path(drive).name
+    try:
+        partitions = [entry.name for entry in sys_dir.iterdir() if (entry / "partition").exists()]
+        holders = [entry.name for entry in (sys_dir / "holders").iterdir()]
+    except OSError:
+        return []
+    return partitions + holders
 
 
-def sync_kernel_partitions(drive: str, wait_seconds: int = 2) -> None:
-    """Force kernel to re-read partition table and wait"""
-    run_command(["blockdev", "--rereadpt", drive], check=False)
-    run_command(["partprobe", drive], check=False)
+def sync_kernel_partitions(drive: str, wait_seconds: float = 2) -> None:
+    """Force kernel to re-read partition table and wait for partitions to go away
+
+    wait_seconds is an upper bound, returns as soon as the kernel no
+    longer reports partitions or holders for the drive.
+    """
+    run_quiet(["blockdev", "--rereadpt", drive])
+    run_quiet(["partprobe", drive])
     # Also trigger udev to settle
-    run_command(["udevadm", "settle", "--timeout=5"], check=False)
-    time.sleep(wait_seconds)
+    run_quiet(["udevadm", "settle", "--timeout=5"])
+    deadline = time.monotonic() + wait_seconds
+    while time.monotonic() < deadline and kernel_partitions(drive):
+        time.sleep(0.05)
+    refresh_snapshot()
 
 
+@cached_per_generation
 def get_partition_list(drive: str) -> list[str]:
     """Get list of partition devices for a drive"""
-    result = run_command(["lsblk", "-ln", "-o", "NAME", drive], check=False)
-    if result.returncode != 0:
-        return []
-
-    lines = result.stdout.strip().split("\n")
-    if len(lines) <= 1:
+    device = get_snapshot().get(drive)
+    if device is None:
         return []
 
+    # Only real partitions, holders such as LVM volumes vanish once deactivated
     partitions = []
-    for part_name in lines[1:]:
-        part_device = f"/dev/{part_name.strip()}"
-        if part_device != drive:
+    for _, child in walk_device_tree(device)[1:]:
+        part_device = child.get("path") or f"/dev/{child['name']}"
+        if child.get("type") != "part" or part_device == drive or part_device in partitions:
+            continue
+        if resolve_block_device(part_device):
             partitions.append(part_device)
     return partitions
 
 
+def device_mountpoints(device: dict[str, Any]) -> list[str]:
+    """Get the mountpoints of an lsblk device (older lsblk only reports one)"""
+    mountpoints = device.get("mountpoints") or [device.get("mountpoint")]
+    return [mountpoint for mountpoint in mountpoints if mountpoint]
+
+
+def get_mountpoints(drive: str) -> list[str]:
+    """Get mountpoints of a drive's partitions and holders, deepest first"""
+    device = get_snapshot().get(drive)
+    if device is None:
+        return []
+
+    mountpoints = [mountpoint for _, child in walk_device_tree(device)[1:] for mountpoint in device_mountpoints(child)]
+    return sorted(set(mountpoints), reverse=True)
+
+
 def stop_raid_arrays(drive: str) -> None:
     """Stop any RAID arrays using this drive"""
-    if not which("mdadm"):
+    if not have("mdadm"):
         return
 
-    print("  Stopping RAID arrays...")
+    progress("  Stopping RAID arrays...")
     # Find RAID arrays that use this drive or its partitions
-    result = run_command(["cat", "/proc/mdstat"], check=False)
-    if result.returncode != 0 or not result.stdout.strip():
+    try:
+        mdstat = Path("/proc/mdstat").read_text()
+    except OSError:
         return
 
     # Get all md devices
-    for line in result.stdout.split("\n"):
+    for line in mdstat.split("\n"):
         if line.startswith("md"):
             md_name = line.split()[0]
             md_device = f"/dev/{md_name}"
             # Stop this array (will fail if drive not part of it, that's ok)
-            run_command(["mdadm", "--stop", md_device], check=False)
+            run_quiet(["mdadm", "--stop", md_device])
 
 
 def remove_raid_metadata(drive: str, partitions: list[str]) -> None:
     """Remove RAID superblock metadata from drive and partitions"""
-    if not which("mdadm"):
+    if not have("mdadm"):
         return
 
-    print("  Removing RAID metadata...")
-    # Remove from partitions first
-    for part in partitions:
-        run_command(["mdadm", "--zero-superblock", "--force", part], check=False)
-    # Remove from whole drive
-    run_command(["mdadm", "--zero-superblock", "--force", drive], check=False)
+    progress("  Removing RAID metadata...")
+    # Remove from partitions first, then from whole drive
+    run_quiet(["mdadm", "--zero-superblock", "--force", *partitions, drive])
+    invalidate_device_cache()
 
 
 def delete_partitions_explicitly(drive: str) -> None:
     """Explicitly delete all partitions using multiple methods"""
-    print("  Deleting partitions explicitly...")
+    progress("  Deleting partitions explicitly...")
 
     # Method 1: Use sfdisk to delete all partitions
     # sfdisk --delete removes all partitions when no partition number specified
-    run_command(["sfdisk", "--delete", drive], check=False)
+    run_quiet(["sfdisk", "--delete", drive])
 
     sync_kernel_partitions(drive, 1)
 
     # Method 2: If partitions still exist, use parted to create empty label
     partitions = get_partition_list(drive)
     if partitions:
-        print("    Using parted to create empty GPT...")
+        progress("    Using parted to create empty GPT...")
         # This overwrites partition table completely
-        run_command(["parted", "-s", drive, "mklabel", "gpt"], check=False)
+        run_quiet(["parted", "-s", drive, "mklabel", "gpt"])
         sync_kernel_partitions(drive, 1)
 
 
+def disk_size_bytes(drive: str) -> int:
+    """Get the size of a drive in bytes with the BLKGETSIZE64 ioctl"""
+    fd = os.open(drive, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        return struct.unpack("Q", fcntl.ioctl(fd, BLKGETSIZE64, b"\0" * 8))[0]
+    finally:
+        os.close(fd)
+
+
+def blkzeroout_regions(drive: str, regions: list[tuple[int, int]]) -> None:
+    """Zero (offset, length) regions of a drive with the BLKZEROOUT ioctl
+
+    The kernel offloads this to the device (write zeroes, or discard where
+    it guarantees zeroed reads), which is far faster than writing on SSDs.
+    """
+    fd = os.open(drive, os.O_WRONLY)
+    try:
+        for offset, size in regions:
+            fcntl.ioctl(fd, BLKZEROOUT, struct.pack("QQ", offset, size))
+    finally:
+        os.close(fd)
+
+
+def write_zero_regions(drive: str, regions: list[tuple[int, int]]) -> None:
+    """Overwrite (offset, length) regions of a drive with zeros
+
+    All regions are written through a single O_DIRECT file descriptor,
+    avoiding a separate dd process per region.
+    """
+    length = max(size for _, size in regions)
+    # Anonymous mappings are zero-filled and page-aligned, as O_DIRECT requires
+    with mmap.mmap(-1, length, flags=mmap.MAP_ANONYMOUS | mmap.MAP_PRIVATE) as zeros, memoryview(zeros) as buffer:
+        fd = os.open(drive, os.O_WRONLY | os.O_DIRECT | os.O_SYNC)
+        try:
+            for offset, size in regions:
+                os.pwrite(fd, buffer[:size], offset)
+        finally:
+            os.close(fd)
+
+
+def zero_partition_table_areas(drive: str) -> None:
+    """Zero the first and last 2MB of a drive (MBR and primary/backup GPT)"""
+    progress("  Zeroing partition table areas...")
+    regions = [(0, ZERO_REGION_BYTES)]
+    with contextlib.suppress(OSError):
+        disk_sectors = disk_size_bytes(drive) // 512
+        # Zero last 2MB (4096 sectors at 512 bytes each) for the backup GPT
+        regions.append((max(0, disk_sectors - 4096) * 512, ZERO_REGION_BYTES))
+    try:
+        blkzeroout_regions(drive, regions)
+    except OSError:
+        # Zero-out not supported by this device, write the zeros ourselves
+        with contextlib.suppress(OSError):
+            write_zero_regions(drive, regions)
+    invalidate_device_cache()
+
+
+def is_already_clean(drive: str) -> bool:
+    """Check if a drive has no partitions, signatures, LVM or RAID metadata"""
+    device = get_snapshot().get(drive)
+    if device is None or device.get("children") or device.get("fstype") or device.get("pttype"):
+        return False
+    if device_mountpoints(device):
+        return False
+    if drive in probe_signatures([drive]):
+        return False
+    if have("pvs") and drive in probe_lvm_pvs():
+        return False
+    return not (have("mdadm") and drive in probe_raid_members([drive]))
+
+
 def wipe_drive_once(drive: str, attempt: int) -> bool:
     """Single wipe attempt. Returns True if drive appears clean."""
     if attempt > 1:
-        print(f"  Wipe attempt {attempt}/{MAX_WIPE_ATTEMPTS}...")
+        progress(f"  Wipe attempt {attempt}/{MAX_WIPE_ATTEMPTS}...")
 
     # Step 1: Stop any RAID arrays using this drive
+    check_cancelled()
     stop_raid_arrays(drive)
 
-    # Step 2: Unmount all partitions first
+    # Step 2: Unmount all partitions first (re-read devices, stopped RAID arrays are gone)
+    check_cancelled()
+    refresh_snapshot()
     partitions = get_partition_list(drive)
-    for part in partitions:
-        run_command(["umount", "-f", part], check=False)
+    mountpoints = get_mountpoints(drive)
+    if mountpoints:
+        run_quiet(["umount", "-f", *mountpoints])
 
     # Step 3: Deactivate LVM volume groups that might use this drive
-    print("  Deactivating LVM...")
-    # Scan for VGs using this PV
-    result = run_command(["pvs", "--noheadings", "-o", "vg_name", drive], check=False)
-    if result.returncode == 0 and result.stdout.strip():
-        for vg in result.stdout.strip().split("\n"):
-            vg = vg.strip()
-            if vg:
-                run_command(["vgchange", "-an", vg], check=False)
-    for part in partitions:
-        result = run_command(["pvs", "--noheadings", "-o", "vg_name", part], check=False)
-        if result.returncode == 0 and result.stdout.strip():
-            for vg in result.stdout.strip().split("\n"):
-                vg = vg.strip()
-                if vg:
-                    run_command(["vgchange", "-an", vg], check=False)
+    check_cancelled()
+    progress("  Deactivating LVM...")
+    # Scan for PVs among the drive and its partitions, and the VGs using them
+    # (pvs still reports the PVs it found when some devices are not PVs)
+    result = run_command(["pvs", "--noheadings", "-o", "pv_name,vg_name", drive, *partitions], check=False)
+    pv_groups = {}
+    for line in result.stdout.split("\n"):
+        fields = line.split()
+        if fields:
+            pv_groups[os.path.realpath(fields[0])] = fields[1:]
+    vgs = list(dict.fromkeys(vg for groups in pv_groups.values() for vg in groups))
+    if vgs:
+        run_quiet(["vgchange", "-an", *vgs])
 
     # Step 4: Remove RAID metadata
+    check_cancelled()
     remove_raid_metadata(drive, partitions)
 
     # Step 5: Remove LVM metadata
-    print("  Removing LVM metadata...")
-    for part in partitions:
-        run_command(["pvremove", "-ff", "-y", part], check=False)
-    run_command(["pvremove", "-ff", "-y", drive], check=False)
+    check_cancelled()
+    progress("  Removing LVM metadata...")
+    # pvremove removes nothing if any argument is not a PV, so only pass known PVs
+    # and always try the whole drive on its own
+    partition_pvs = [part for part in partitions if os.path.realpath(part) in pv_groups]
+    if partition_pvs:
+        run_quiet(["pvremove", "-ff", "-y", *partition_pvs])
+    run_quiet(["pvremove", "-ff", "-y", drive])
+    invalidate_device_cache()
 
     # Step 6: Remove ZFS labels
-    if which("zpool"):
-        print("  Removing ZFS labels...")
-        run_command(["zpool", "labelclear", "-f", drive], check=False)
-        for part in partitions:
-            run_command(["zpool", "labelclear", "-f", part], check=False)
+    check_cancelled()
+    if have("zpool"):
+        progress("  Removing ZFS labels...")
+        # zpool labelclear only takes one device per call
+        for device in [drive, *partitions]:
+            run_quiet(["zpool", "labelclear", "-f", device])
 
     # Step 7: Wipe filesystem signatures
-    print("  Wiping filesystem signatures...")
-    for part in partitions:
-        run_command(["wipefs", "--all", "--force", part], check=False)
-    run_command(["wipefs", "--all", "--force", drive], check=False)
+    check_cancelled()
+    progress("  Wiping filesystem signatures...")
+    # wipefs skips every argument after one it cannot open, so wipe the drive separately
+    if partitions:
+        run_quiet(["wipefs", "--all", "--force", *partitions])
+    run_quiet(["wipefs", "--all", "--force", drive])
+    invalidate_device_cache()
 
     # Step 8: Delete partitions explicitly
+    check_cancelled()
     delete_partitions_explicitly(drive)
 
     # Step 9: Destroy GPT/MBR partition tables
-    print("  Destroying partition tables...")
-    run_command(["sgdisk", "--zap-all", drive], check=False)
+    check_cancelled()
+    progress("  Destroying partition tables...")
+    run_quiet(["sgdisk", "--zap-all", drive])
+    invalidate_device_cache()
 
     # Step 10: Zero partition table areas (beginning and end of disk)
-    print("  Zeroing partition table areas...")
-    with contextlib.suppress(subprocess.SubprocessError, subprocess.TimeoutExpired, OSError):
-        # Zero first 2MB (covers MBR, GPT header, and partition entries)
-        subprocess.run(
-            ["dd", "if=/dev/zero", f"of={drive}", "bs=1M", "count=2"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=False,
-            timeout=60,
-        )
-
-    # Zero end of disk (backup GPT)
-    result = run_command(["blockdev", "--getsz", drive], check=False)
-    if result.returncode == 0:
-        try:
-            disk_sectors = int(result.stdout.strip())
-            # Zero last 2MB (4096 sectors at 512 bytes each)
-            seek_pos = max(0, disk_sectors - 4096)
-            subprocess.run(
-                ["dd", "if=/dev/zero", f"of={drive}", "bs=512", f"seek={seek_pos}", "count=4096"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=False,
-                timeout=60,
-            )
-        except (subprocess.SubprocessError, subprocess.TimeoutExpired, OSError, ValueError):
-            pass
+    check_cancelled()
+    zero_partition_table_areas(drive)
 
     # Step 11: Final sync with longer wait
-    print("  Syncing kernel partition table...")
+    check_cancelled()
+    progress("  Syncing kernel partition table...")
     sync_kernel_partitions(drive, 3)
 
     # Verify no partitions remain
@@ -485,17 +833,27 @@ def wipe_drive(device: str) -> bool:
     device_info = get_device_info(device)
     drive = device_info["real_path"]
 
-    print()
-    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    print(f"Wiping: {device}")
+    emit()
+    emit("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    progress(f"Wiping: {device}")
     if device != drive:
-        print(f"  → {drive}")
-    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        emit(f"  → {drive}")
+    emit("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
 
     if not device_info["exists"]:
         warn(f"Device not found, skipping: {drive}")
         return True
 
+    check_cancelled()
+
+    # Fast path: nothing to remove, only zero the partition table areas
+    if is_already_clean(drive):
+        info("  Drive is already clean")
+        check_cancelled()
+        zero_partition_table_areas(drive)
+        success(f"Drive wiped: {device}")
+        return True
+
     # Retry loop - keep trying until clean or max attempts
     for attempt in range(1, MAX_WIPE_ATTEMPTS + 1):
         is_clean = wipe_drive_once(drive, attempt)
@@ -505,6 +863,7 @@ def wipe_drive(device: str) -> bool:
         if attempt < MAX_WIPE_ATTEMPTS:
             warn(f"Partitions still present, retrying ({attempt}/{MAX_WIPE_ATTEMPTS})...")
             time.sleep(2)
+            check_cancelled()
 
     # Final check after all attempts
     remaining = get_partition_list(drive)
@@ -521,35 +880,75 @@ def wipe_drive(device: str) -> bool:
 # =============================================================================
 
 
+def probe_signatures(drives: list[str]) -> dict[str, str]:
+    """Get blkid output for each drive that still has a signature, in one blkid call"""
+    if not drives:
+        return {}
+
+    result = run_command(["blkid", *drives], check=False)
+    signatures = {}
+    for line in result.stdout.strip().split("\n"):
+        device, sep, _ = line.partition(":")
+        if sep:
+            signatures[device] = line.strip()
+    return signatures
+
+
+def probe_lvm_pvs() -> set[str]:
+    """Get all LVM physical volumes in one pvs call"""
+    result = run_command(["pvs", "--noheadings", "-o", "pv_name"], check=False)
+    return {os.path.realpath(line.strip()) for line in result.stdout.split("\n") if line.strip()}
+
+
+def probe_raid_members(drives: list[str]) -> set[str]:
+    """Get drives that still carry an md superblock, in one mdadm call"""
+    if not drives:
+        return set()
+
+    # mdadm prints a "<device>:" header followed by the superblock of each device
+    result = run_command(["mdadm", "--examine", *drives], check=False)
+    members = set()
+    current = None
+    for line in result.stdout.split("\n"):
+        if line.endswith(":") and not line.startswith(" "):
+            current = line[:-1]
+        elif current and "Array UUID" in line:
+            members.add(current)
+    return members
+
+
 def verify_clean(devices: list[str]) -> bool:
     """Verify drives are clean
 
     Returns True if all clean, False otherwise
     """
-    print()
-    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    print("Verification")
-    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    print()
+    emit()
+    emit("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    emit("Verification")
+    emit("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    emit()
 
     # Force partition table refresh before verification
-    print("Refreshing partition tables before verification...")
-    for device in devices:
-        device_info = get_device_info(device)
-        drive = device_info["real_path"]
-        if device_info["exists"]:
-            sync_kernel_partitions(drive, 1)
-    # Extra wait after all syncs
-    time.sleep(2)
-    print()
+    emit("Refreshing partition tables before verification...")
+    existing = [device_info["real_path"] for device_info in map(get_device_info, devices) if device_info["exists"]]
+    run_parallel(functools.partial(sync_kernel_partitions, wait_seconds=1), existing)
+    # Re-read once more now that every drive has synced
+    refresh_snapshot()
+    emit()
+
+    # Probe all drives at once rather than running blkid/pvs/mdadm per drive
+    device_infos = {device: get_device_info(device) for device in devices}
+    drives = [device_info["real_path"] for device_info in device_infos.values() if device_info["exists"]]
+    signatures = probe_signatures(drives)
+    lvm_pvs = probe_lvm_pvs() if have("pvs") else None
+    raid_members = probe_raid_members(drives) if have("mdadm") else None
 
     all_clean = True
 
-    for device in devices:
-        device_info = get_device_info(device)
+    for device, device_info in device_infos.items():
         drive = device_info["real_path"]
 
-        print(f"Checking: {device}")
+        progress(f"Checking: {device}")
 
         if not device_info["exists"]:
             warn("  Device not found, skipping verification")
@@ -564,39 +963,37 @@ def verify_clean(devices: list[str]) -> bool:
             success("  No partitions")
 
         # Check for filesystem signatures
-        result = run_command(["blkid", drive], check=False)
-        if result.returncode == 0 and result.stdout.strip():
+        if drive in signatures:
             warn("  Still has filesystem signatures!")
-            print(f"    {result.stdout.strip()}")
+            emit(f"    {signatures[drive]}")
             all_clean = False
         else:
             success("  No filesystem signatures")
 
         # Check for LVM
-        if which("pvs"):
-            result = run_command(["pvs", "--noheadings", drive], check=False)
-            if result.returncode == 0 and result.stdout.strip():
+        if lvm_pvs is not None:
+            if drive in lvm_pvs:
                 warn("  Still has LVM metadata!")
                 all_clean = False
             else:
                 success("  No LVM metadata")
 
         # Check for RAID metadata
-        if which("mdadm"):
-            result = run_command(["mdadm", "--examine", drive], check=False)
-            if result.returncode == 0 and "Array UUID" in result.stdout:
+        if raid_members is not None:
+            if drive in raid_members:
                 warn("  Still has RAID metadata!")
                 all_clean = False
             else:
                 success("  No RAID metadata")
 
-        print()
+        emit()
 
     if all_clean:
         success("All drives verified clean!")
-        return True
-    warn("Some drives may not be completely clean. Review warnings above.")
-    return False
+    else:
+        warn("Some drives may not be completely clean. Review warnings above.")
+    flush_output()
+    return all_clean
 
 
 # =============================================================================
@@ -622,18 +1019,18 @@ def get_devices_interactive() -> list[str]:
     if usb_devices:
         info("USB devices detected (will be excluded by default):")
         for dev in usb_devices:
-            print(f"  🔒 {dev} (protected)")
-        print()
+            emit(f"  🔒 {dev} (protected)")
+        emit()
 
     # Show default selection
     info("Non-USB devices that will be wiped:")
     for dev in default_devices:
         device_info = get_device_info(dev)
-        print(f"  ✗ {dev}")
+        emit(f"  ✗ {dev}")
         if "lsblk" in device_info:
             for line in device_info["lsblk"].split("\n")[1:]:  # Skip header
-                print(f"    {line}")
-    print()
+                emit(f"    {line}")
+    emit()
 
     # Prepare default value string
     default_str = " ".join(default_devices)
@@ -641,31 +1038,33 @@ def get_devices_interactive() -> list[str]:
     info("Press Enter to wipe all non-USB devices shown above")
     info("OR specify custom devices (space-separated):")
     info("Examples:")
-    print("  - /dev/sda /dev/sdb")
-    print("  - /dev/nvme0n1")
-    print()
+    emit("  - /dev/sda /dev/sdb")
+    emit("  - /dev/nvme0n1")
+    emit()
 
-    devices_input = input(f"Devices [{default_str}]: ").strip()
+    devices_input = prompt(f"Devices [{default_str}]: ").strip()
 
     # Use default if empty
     if not devices_input:
         info("Using default: all non-USB devices")
         return default_devices
 
-    # Parse custom input
-    devices = devices_input.split()
+    # Parse custom input, a drive given twice is only wiped once under the first path typed
+    devices: dict[str, str] = {}
+    for device in devices_input.split():
+        real_device = resolve_block_device(device)
+        if real_device is None:
+            warn(f"Not a block device: {device}")
+            continue
+        devices.setdefault(real_device, device)
 
     # Validate device paths
     valid_devices = []
-    for device in devices:
-        if not device.startswith("/dev/"):
-            warn(f"Invalid device path (must start with /dev/): {device}")
-            continue
-
+    for device in devices.values():
         # Check if it's a USB device
         if is_usb_device(device):
             warn(f"Refusing to wipe USB device: {device} (likely your boot drive!)")
-            confirm = input("  Override and wipe this USB device anyway? Type 'YES' to confirm: ")
+            confirm = prompt("  Override and wipe this USB device anyway? Type 'YES' to confirm: ")
             if confirm == "YES":
                 valid_devices.append(device)
             else:
@@ -707,31 +1106,31 @@ Examples:
     check_root()
     check_tools()
 
-    print()
-    print("╔═══════════════════════════════════════════════════════════╗")
-    print("║                                                           ║")
-    print("║              Home Server Disk Wipe Tool                   ║")
-    print("║                                                           ║")
-    print("╚═══════════════════════════════════════════════════════════╝")
-    print()
+    emit()
+    emit("╔═══════════════════════════════════════════════════════════╗")
+    emit("║                                                           ║")
+    emit("║              Home Server Disk Wipe Tool                   ║")
+    emit("║                                                           ║")
+    emit("╚═══════════════════════════════════════════════════════════╝")
+    emit()
 
     # Get devices from arguments or interactively
     if args.devices:
-        devices = []
+        # A drive given twice is only wiped once, under the first path given for it
+        resolved: dict[str, str] = {}
         for device in args.devices:
-            # Validate device path
-            if not device.startswith("/dev/"):
-                error(f"Invalid device path (must start with /dev/): {device}")
-
-            # Check if device exists
-            if not Path(device).exists():
-                error(f"Device does not exist: {device}")
+            real_device = resolve_block_device(device)
+            if real_device is None:
+                error(f"Not a block device: {device}")
+            resolved.setdefault(real_device, device)
 
+        devices = []
+        for device in resolved.values():
             # Check if it's a USB device
             if is_usb_device(device):
                 warn(f"Refusing to wipe USB device: {device} (likely your boot drive!)")
-                print()
-                confirm = input("  Override and wipe this USB device anyway? Type 'YES' to confirm: ")
+                emit()
+                confirm = prompt("  Override and wipe this USB device anyway? Type 'YES' to confirm: ")
                 if confirm == "YES":
                     devices.append(device)
                 else:
@@ -752,24 +1151,25 @@ Examples:
     if not confirm_wipe(devices):
         return 0
 
-    # Wipe each drive
-    print()
-    print("Starting wipe operation...")
-    for device in devices:
-        wipe_drive(device)
+    # Wipe all drives in parallel, each drive's output is shown once it finishes
+    emit()
+    emit("Starting wipe operation...")
+    flush_output()
+    run_parallel(wipe_drive, devices)
 
     # Verify clean
     verify_clean(devices)
 
-    print()
+    emit()
     success("╔═══════════════════════════════════════════════════════════╗")
     success("║                                                           ║")
     success("║         Disk wipe completed successfully!                 ║")
     success("║                                                           ║")
     success("╚═══════════════════════════════════════════════════════════╝")
-    print()
-    print("All specified devices have been wiped clean.")
-    print()
+    emit()
+    emit("All specified devices have been wiped clean.")
+    emit()
+    flush_output()
     return 0
 
 
@@ -777,8 +1177,10 @@ if __name__ == "__main__":
     try:
         sys.exit(main())
     except KeyboardInterrupt:
-        print(f"\n{Colors.YELLOW}Cancelled by user{Colors.NC}")
+        emit(f"\n{Colors.YELLOW}Cancelled by user{Colors.NC}")
+        flush_output()
         sys.exit(1)
     except Exception as e:
+        flush_output()
         print(f"{Colors.RED}Error: {e}{Colors.NC}", file=sys.stderr)
         sys.exit(1)